@@ -1,40 +1,88 @@
 #!/usr/bin/env python3
 
+import asyncio
 import time
-import statistics
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 class PerformanceBenchmark:
     def __init__(self, base_url='http://localhost:8000'):
         self.base_url = base_url
-    
+        # Reuse one pooled connection across iterations so timings measure the
+        # server, not TCP/TLS handshakes.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Connection': 'keep-alive',
+            'Keep-Alive': 'timeout=30, max=1000',
+        })
+
     def benchmark_endpoint(self, method, endpoint, payload=None, iterations=100):
         times = []
+        _perf = time.perf_counter
         for _ in range(iterations):
-            start = time.time()
+            start = _perf()
             if method == 'GET':
-                requests.get(f'{self.base_url}{endpoint}')
+                self.session.get(f'{self.base_url}{endpoint}')
             elif method == 'POST':
-                requests.post(f'{self.base_url}{endpoint}', json=payload)
-            elapsed = time.time() - start
-            times.append(elapsed * 1000)
-        
+                self.session.post(f'{self.base_url}{endpoint}', json=payload)
+            times.append((_perf() - start) * 1000)
+
+        return self._summarize(endpoint, times)
+
+    async def benchmark_endpoint_async(self, method, endpoint, payload=None, iterations=100):
+        """Fire all iterations concurrently over a shared keep-alive client."""
+        if httpx is None:
+            raise RuntimeError('httpx is required for async benchmarks')
+
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits) as client:
+            async def timed_request():
+                start = time.perf_counter()
+                if method == 'GET':
+                    await client.get(endpoint)
+                elif method == 'POST':
+                    await client.post(endpoint, json=payload)
+                return (time.perf_counter() - start) * 1000
+
+            times = await asyncio.gather(*(timed_request() for _ in range(iterations)))
+
+        return self._summarize(endpoint, list(times))
+
+    @staticmethod
+    def _summarize(endpoint, times):
+        # np.quantile selects via introselect (O(n)) instead of sorting.
+        arr = np.asarray(times, dtype=np.float64)
+        p50, p95, p99 = np.quantile(arr, [0.5, 0.95, 0.99], method='lower')
         return {
             'endpoint': endpoint,
-            'p50': statistics.median(times),
-            'p95': sorted(times)[int(len(times) * 0.95)],
-            'p99': sorted(times)[int(len(times) * 0.99)],
-            'avg': statistics.mean(times),
-            'min': min(times),
-            'max': max(times),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'avg': float(arr.mean()),
+            'min': float(arr.min()),
+            'max': float(arr.max()),
         }
-    
+
     def run_suite(self):
         print('Running Performance Benchmarks...')
         result = self.benchmark_endpoint('POST', '/api/risk/assess',
             {'risk_id': '123', 'metrics': [1, 2, 3]})
         print(f'Risk Assessment P95: {result["p95"]:.2f}ms')
 
+        if httpx is not None:
+            result = asyncio.run(self.benchmark_endpoint_async('POST', '/api/risk/assess',
+                {'risk_id': '123', 'metrics': [1, 2, 3]}))
+            print(f'Risk Assessment P95 (concurrent): {result["p95"]:.2f}ms')
+
 if __name__ == '__main__':
     benchmark = PerformanceBenchmark()
     benchmark.run_suite()
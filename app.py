@@ -1,43 +1,63 @@
 from typing import List, Dict
 from datetime import datetime
+import numpy as np
 from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict
+from pydantic_core import to_json
 from fastapi_mcp import FastApiMCP
 
 app = FastAPI(title="ST Risk PoC")
 
+# Shared by every schema: immutable and strict about unknown fields
+_MODEL_CONFIG = ConfigDict(extra="forbid", frozen=True)
+
 class CellInput(BaseModel):
+    model_config = _MODEL_CONFIG
+
     cell_id: int
     features: Dict[str, float | int]
 
 class ScoreRequest(BaseModel):
+    model_config = _MODEL_CONFIG
+
     time: datetime
     horizon_sec: int
     cells: List[CellInput]
     n_scenarios: int = 5
 
 class Scenario(BaseModel):
+    model_config = _MODEL_CONFIG
+
     scenario_id: int
     risk_value: float
 
 class DistributionParams(BaseModel):
+    model_config = _MODEL_CONFIG
+
     p_event: float
     q05: float
     q50: float
     q95: float
 
 class ZoneForecast(BaseModel):
+    model_config = _MODEL_CONFIG
+
     cell_id: int
     distribution_params: DistributionParams
     scenarios: List[Scenario]
 
 class ScoreResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+
     model_version: str
     time: datetime
     horizon_sec: int
     zones: List[ZoneForecast]
 
 class ZoneRisk(BaseModel):
+    model_config = _MODEL_CONFIG
+
     cell_id: int
     p_event: float
     mean_risk: float
@@ -46,50 +66,77 @@ class ZoneRisk(BaseModel):
     q95: float
 
 class RiskMapResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+
     time: datetime
     horizon_sec: int
     aggregated: List[ZoneRisk]
 
+def _json_response(model: BaseModel) -> Response:
+    # Serialize straight to JSON bytes in pydantic-core (Rust), bypassing
+    # response_model re-validation and jsonable_encoder; response_model is
+    # still declared on the routes for the OpenAPI schema.
+    return Response(content=to_json(model), media_type="application/json")
+
 @app.post("/score-snapshot", response_model=ScoreResponse)
-async def score_snapshot(req: ScoreRequest) -> ScoreResponse:
-    zones: List[ZoneForecast] = []
-    for cell in req.cells:
-        count_1h = float(cell.features.get("count_1h", 1))
-        p = min(0.99, 0.01 * count_1h)
-        zones.append(
-            ZoneForecast(
-                cell_id=cell.cell_id,
-                distribution_params=DistributionParams(
-                    p_event=p,
-                    q05=p * 0.2,
-                    q50=p * 0.7,
-                    q95=min(1.0, p * 1.5),
-                ),
-                scenarios=[
-                    Scenario(scenario_id=i, risk_value=p * (0.5 + i / req.n_scenarios))
-                    for i in range(1, req.n_scenarios + 1)
-                ],
-            )
+async def score_snapshot(req: ScoreRequest) -> Response:
+    n_cells = len(req.cells)
+    counts = np.fromiter(
+        (cell.features.get("count_1h", 1) for cell in req.cells),
+        dtype=np.float64,
+        count=n_cells,
+    )
+    p = np.minimum(0.99, 0.01 * counts)
+    q05 = p * 0.2
+    q50 = p * 0.7
+    q95 = np.minimum(1.0, p * 1.5)
+    # Scenario i scales p by (0.5 + i / n); one outer product covers all cells.
+    factors = 0.5 + np.arange(1, req.n_scenarios + 1) / req.n_scenarios
+    risk = np.outer(p, factors)
+
+    # Values are computed server-side, so skip Pydantic validation on output.
+    # Constructors are bound locally to avoid attribute lookups per object.
+    construct_zone = ZoneForecast.model_construct
+    construct_params = DistributionParams.model_construct
+    construct_scenario = Scenario.model_construct
+    scenario_ids = range(1, req.n_scenarios + 1)
+    zones: List[ZoneForecast] = [
+        construct_zone(
+            cell_id=cell.cell_id,
+            distribution_params=construct_params(
+                p_event=p_i, q05=q05_i, q50=q50_i, q95=q95_i
+            ),
+            scenarios=[
+                construct_scenario(scenario_id=i, risk_value=v)
+                for i, v in zip(scenario_ids, risk_row)
+            ],
         )
-    return ScoreResponse(
+        for cell, p_i, q05_i, q50_i, q95_i, risk_row in zip(
+            req.cells, p.tolist(), q05.tolist(), q50.tolist(), q95.tolist(), risk.tolist()
+        )
+    ]
+    return _json_response(ScoreResponse.model_construct(
         model_version="poc_v1",
         time=req.time,
         horizon_sec=req.horizon_sec,
         zones=zones,
-    )
+    ))
 
 @app.get("/risk-map", response_model=RiskMapResponse)
-async def get_risk_map(time: datetime, horizon_sec: int) -> RiskMapResponse:
+async def get_risk_map(time: datetime, horizon_sec: int) -> Response:
     aggregated = [
-        ZoneRisk(cell_id=1, p_event=0.1, mean_risk=0.08, q05=0.01, q50=0.07, q95=0.2),
-        ZoneRisk(cell_id=2, p_event=0.3, mean_risk=0.25, q05=0.10, q50=0.24, q95=0.5),
+        ZoneRisk.model_construct(cell_id=1, p_event=0.1, mean_risk=0.08, q05=0.01, q50=0.07, q95=0.2),
+        ZoneRisk.model_construct(cell_id=2, p_event=0.3, mean_risk=0.25, q05=0.10, q50=0.24, q95=0.5),
     ]
-    return RiskMapResponse(time=time, horizon_sec=horizon_sec, aggregated=aggregated)
+    return _json_response(
+        RiskMapResponse.model_construct(time=time, horizon_sec=horizon_sec, aggregated=aggregated)
+    )
 
+# No http_client: fastapi-mcp's default dispatches tool calls in-process
+# through httpx.ASGITransport, with no network hop and no host/port to pin
 mcp = FastApiMCP(
     app,
     name="st-risk-mcp",
     description="Spatio-temporal risk PoC tools",
-    base_url="http://localhost:8000"
 )
 mcp.mount_http()
@@ -1,23 +1,46 @@
-app_fastapi_prometheus_integration.py# FastAPI Prometheus Integration Example
+# FastAPI Prometheus Integration Example
 # Copy this code into your app.py to enable metrics collection
 
 from fastapi import FastAPI, Request
 from fastapi.responses import Response
-from prometheus_client import Counter, Histogram, generate_latest, REGISTRY
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.exposition import choose_encoder
+import gzip
+import os
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Monotonic high-resolution clock, bound once for the middleware hot path
+_perf = time.perf_counter
+
 # Initialize FastAPI app
 app = FastAPI(title="st-risk-platform")
 
 # ===== PROMETHEUS METRICS =====
+# Sub-10ms buckets so P50/P95 are resolvable for fast endpoints.
+# Override with a comma-separated list, e.g. HTTP_LATENCY_BUCKETS="0.001,0.01,0.1,1"
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _latency_buckets() -> tuple:
+    """Read histogram buckets from configuration, falling back to defaults."""
+    raw = os.getenv('HTTP_LATENCY_BUCKETS')
+    if not raw:
+        return DEFAULT_LATENCY_BUCKETS
+    try:
+        return tuple(sorted(float(b) for b in raw.split(',') if b.strip()))
+    except ValueError:
+        logger.warning(f"Invalid HTTP_LATENCY_BUCKETS={raw!r}, using defaults")
+        return DEFAULT_LATENCY_BUCKETS
+
+
 http_request_duration_seconds = Histogram(
     'http_request_duration_seconds',
     'HTTP request latency (seconds)',
     labelnames=['method', 'endpoint', 'status'],
-    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+    buckets=_latency_buckets()
 )
 
 http_requests_total = Counter(
@@ -26,20 +49,43 @@ http_requests_total = Counter(
     labelnames=['method', 'endpoint', 'status']
 )
 
-requests_in_progress = Histogram(
+# Labelled by method only: the route template is not resolved until the
+# request has been dispatched, and raw paths would explode cardinality.
+requests_in_progress = Gauge(
     'requests_in_progress',
     'Requests currently being processed',
-    labelnames=['method', 'endpoint']
+    labelnames=['method']
 )
 
+# Bound metric children per (method, endpoint, status class), so the hot path
+# skips the label-tuple lookup inside prometheus_client after first use
+_child_cache: dict = {}
+
+
+def _metric_children(method: str, endpoint: str, status_code: int) -> tuple:
+    """Return (duration histogram, request counter) children for a label set."""
+    # Status is recorded as a class ("2xx", "5xx") to bound cardinality
+    key = (method, endpoint, f"{status_code // 100}xx")
+    children = _child_cache.get(key)
+    if children is None:
+        children = (
+            http_request_duration_seconds.labels(*key),
+            http_requests_total.labels(*key),
+        )
+        _child_cache[key] = children
+    return children
+
+
 # ===== MIDDLEWARE =====
 @app.middleware("http")
 async def prometheus_middleware(request: Request, call_next):
     """Track HTTP requests and expose metrics to Prometheus."""
     method = request.method
-    endpoint = request.url.path
     
-    start_time = time.time()
+    start_time = _perf()
+    
+    in_progress = requests_in_progress.labels(method)
+    in_progress.inc()
     
     try:
         response = await call_next(request)
@@ -50,27 +96,35 @@ async def prometheus_middleware(request: Request, call_next):
         raise
     finally:
         # Record metrics
-        duration = time.time() - start_time
-        
-        http_request_duration_seconds.labels(
-            method=method,
-            endpoint=endpoint,
-            status=status_code
-        ).observe(duration)
+        duration = _perf() - start_time
+        in_progress.dec()
+        # Route template (e.g. /assess/{portfolio_id}) keeps label cardinality
+        # bounded; it is only resolved once routing has run inside call_next.
+        route = request.scope.get('route')
+        endpoint = route.path if route else 'unmatched'
         
-        http_requests_total.labels(
-            method=method,
-            endpoint=endpoint,
-            status=status_code
-        ).inc()
+        duration_child, count_child = _metric_children(method, endpoint, status_code)
+        duration_child.observe(duration)
+        count_child.inc()
     
     return response
 
 # ===== METRICS ENDPOINT =====
 @app.get("/metrics", tags=["monitoring"])
-def metrics():
-    """Expose Prometheus metrics."""
-    return Response(generate_latest(REGISTRY), media_type="text/plain")
+def metrics(request: Request):
+    """Expose Prometheus metrics.
+    
+    Serves OpenMetrics when the scraper asks for it, and gzips the payload
+    when accepted (the exposition format is highly repetitive).
+    """
+    encoder, content_type = choose_encoder(request.headers.get('accept'))
+    payload = encoder(REGISTRY)
+    # The body depends on both request headers, so caches must key on them
+    headers = {'Vary': 'Accept, Accept-Encoding'}
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        payload = gzip.compress(payload, compresslevel=1)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(payload, headers=headers, media_type=content_type)
 
 # ===== HEALTH CHECKS =====
 @app.get("/health", tags=["health"])
@@ -91,4 +145,4 @@ def ready():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, timeout_keep_alive=30)
@@ -15,17 +15,35 @@ Expected improvements:
 
 import asyncio
 import logging
+import os
+from collections import deque
 from typing import Callable, Any, List, Optional
 from concurrent.futures import ThreadPoolExecutor
 from functools import wraps, partial
 from datetime import datetime
 import time
 
+import numpy as np
 from fastapi import BackgroundTasks, HTTPException
 from pydantic import BaseModel
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 logger = logging.getLogger(__name__)
 
+# Monotonic high-resolution clock for latency measurements
+_perf = time.perf_counter
+
+# Shared executor for blocking work; creating a pool per call costs more than
+# the short tasks it runs.
+_SHARED_EXECUTOR = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) + 4),
+    thread_name_prefix='risk_platform_worker'
+)
+
 
 class AsyncTaskQueue:
     """Manages async task execution with concurrency control."""
@@ -33,26 +51,47 @@ class AsyncTaskQueue:
     def __init__(self, max_concurrent: int = 20):
         self.max_concurrent = max_concurrent
         self.semaphore = asyncio.Semaphore(max_concurrent)
-        self.tasks = []
         self.completed = 0
         self.failed = 0
     
     async def add_task(self, coro):
         """Add a task to the queue."""
         async with self.semaphore:
-            try:
-                result = await coro
-                self.completed += 1
-                return result
-            except Exception as e:
-                self.failed += 1
-                logger.error(f"Task failed: {e}")
-                raise
+            return await self._run(coro)
+    
+    async def _run(self, coro):
+        """Await a coroutine and record its outcome."""
+        try:
+            result = await coro
+            self.completed += 1
+            return result
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Task failed: {e}")
+            raise
     
     async def add_tasks(self, coros: List):
-        """Add multiple tasks and wait for all."""
-        tasks = [self.add_task(coro) for coro in coros]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+        """Add multiple tasks and wait for all.
+        
+        Items may be coroutines or zero-argument coroutine factories. Only
+        ``max_concurrent`` worker tasks are created; factories are called when
+        a worker picks them up, so pending items never become Task objects.
+        Results keep input order, with exceptions returned in place.
+        """
+        results = [None] * len(coros)
+        pending = iter(enumerate(coros))
+        
+        async def worker():
+            # Workers share one iterator, so each item is taken exactly once
+            for idx, item in pending:
+                try:
+                    results[idx] = await self._run(item() if callable(item) else item)
+                except Exception as e:
+                    results[idx] = e
+        
+        n_workers = min(self.max_concurrent, len(coros))
+        await asyncio.gather(*(worker() for _ in range(n_workers)))
+        return results
     
     def get_stats(self):
         """Get queue statistics."""
@@ -82,13 +121,13 @@ def async_task(func: Callable):
             background_tasks.add_task(async_wrapper, *args, **kwargs)
             return {'status': 'queued'}
         else:
-            # Run synchronously
             try:
-                loop = asyncio.get_event_loop()
+                loop = asyncio.get_running_loop()
             except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            return loop.run_until_complete(async_wrapper(*args, **kwargs))
+                # Plain sync caller with no loop in this thread
+                return asyncio.run(async_wrapper(*args, **kwargs))
+            # Already inside the app's loop: schedule and hand back the future
+            return asyncio.ensure_future(async_wrapper(*args, **kwargs), loop=loop)
     
     return async_wrapper
 
@@ -118,10 +157,13 @@ class BatchProcessor:
         
         logger.info(f"Processing {len(items)} items in {len(batches)} batches")
         
+        # Resolved once per call rather than once per item
+        is_coro = asyncio.iscoroutinefunction(processor_func)
+        
         try:
             for batch_idx, batch in enumerate(batches):
                 batch_results = await asyncio.wait_for(
-                    self._process_batch_concurrent(batch, processor_func),
+                    self._process_batch_concurrent(batch, processor_func, is_coro),
                     timeout=timeout
                 )
                 results.extend(batch_results)
@@ -135,13 +177,23 @@ class BatchProcessor:
     async def _process_batch_concurrent(
         self,
         items: List[Any],
-        processor_func: Callable
+        processor_func: Callable,
+        is_coro: bool
     ) -> List[Any]:
         """Process batch items concurrently."""
-        tasks = [
-            self._process_item_with_semaphore(item, processor_func)
-            for item in items
-        ]
+        if is_coro:
+            tasks = [
+                self._process_item_with_semaphore(item, processor_func)
+                for item in items
+            ]
+        else:
+            # Sync processors would block the loop if called inline; the
+            # shared executor runs them off-loop and bounds their concurrency
+            loop = asyncio.get_running_loop()
+            tasks = [
+                loop.run_in_executor(_SHARED_EXECUTOR, processor_func, item)
+                for item in items
+            ]
         return await asyncio.gather(*tasks, return_exceptions=True)
     
     async def _process_item_with_semaphore(
@@ -151,7 +203,7 @@ class BatchProcessor:
     ) -> Any:
         """Process single item with semaphore."""
         async with self.semaphore:
-            return await processor_func(item) if asyncio.iscoroutinefunction(processor_func) else processor_func(item)
+            return await processor_func(item)
 
 
 class RiskAssessmentBatchProcessor(BatchProcessor):
@@ -186,9 +238,26 @@ class RiskAssessmentBatchProcessor(BatchProcessor):
 class ParallelDataFetcher:
     """Fetch data from multiple sources in parallel."""
     
-    def __init__(self, max_concurrent: int = 10):
+    def __init__(self, max_concurrent: int = 10, http2: bool = True):
         self.max_concurrent = max_concurrent
         self.semaphore = asyncio.Semaphore(max_concurrent)
+        # One keep-alive client shared by all fetches; avoids a TCP/TLS
+        # handshake per request
+        self.client = self._build_client(http2) if httpx else None
+    
+    def _build_client(self, http2: bool):
+        """Create the shared HTTP client."""
+        limits = httpx.Limits(
+            max_connections=self.max_concurrent * 2,
+            max_keepalive_connections=self.max_concurrent
+        )
+        timeout = httpx.Timeout(5.0, connect=2.0)
+        try:
+            return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+        except ImportError:
+            # HTTP/2 needs the optional 'h2' package
+            logger.warning("h2 not installed, using HTTP/1.1 keep-alive")
+            return httpx.AsyncClient(limits=limits, timeout=timeout)
     
     async def fetch_multiple(
         self,
@@ -209,6 +278,29 @@ class ParallelDataFetcher:
             except Exception as e:
                 logger.error(f"Fetch failed: {e}")
                 return None
+    
+    async def fetch_json(self, url: str, params: Optional[dict] = None) -> Any:
+        """GET a URL over the shared client and decode the JSON body."""
+        if self.client is None:
+            raise RuntimeError("httpx not installed")
+        
+        async with self.semaphore:
+            try:
+                response = await self.client.get(url, params=params)
+                response.raise_for_status()
+                return response.json()
+            except Exception as e:
+                logger.error(f"Fetch failed for {url}: {e}")
+                return None
+    
+    async def fetch_many(self, urls: List[str]) -> List[Any]:
+        """GET several URLs concurrently over the shared client."""
+        return await asyncio.gather(*(self.fetch_json(url) for url in urls))
+    
+    async def aclose(self):
+        """Close the shared client (call from the app's lifespan shutdown)."""
+        if self.client is not None:
+            await self.client.aclose()
 
 
 class RateLimiter:
@@ -217,16 +309,16 @@ class RateLimiter:
     def __init__(self, max_requests: int = 100, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = []
+        # Request timestamps in arrival order; oldest at the left
+        self.requests = deque(maxlen=max_requests)
+        self._lock = asyncio.Lock()
     
     async def acquire(self) -> bool:
         """Check if request can be processed."""
-        now = time.time()
-        # Clean old requests outside window
-        self.requests = [
-            req_time for req_time in self.requests
-            if now - req_time < self.window_seconds
-        ]
+        now = time.monotonic()
+        # Drop requests that have left the window
+        while self.requests and now - self.requests[0] >= self.window_seconds:
+            self.requests.popleft()
         
         if len(self.requests) < self.max_requests:
             self.requests.append(now)
@@ -235,37 +327,49 @@ class RateLimiter:
     
     async def wait_if_needed(self):
         """Wait if rate limit is exceeded."""
-        while not await self.acquire():
-            await asyncio.sleep(0.1)
+        # Serialize waiters so slots are handed out in arrival order
+        async with self._lock:
+            while not await self.acquire():
+                # Sleep exactly until the oldest request expires
+                await asyncio.sleep(
+                    max(0.0, self.requests[0] + self.window_seconds - time.monotonic())
+                )
 
 
 def run_in_threadpool(func: Callable):
     """Run CPU-intensive function in thread pool."""
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(
-                executor,
-                partial(func, *args, **kwargs)
-            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _SHARED_EXECUTOR,
+            partial(func, *args, **kwargs)
+        )
     return wrapper
 
 
+def shutdown_executor(wait: bool = False):
+    """Shut down the shared executor (call from the app's lifespan shutdown)."""
+    _SHARED_EXECUTOR.shutdown(wait=wait)
+
+
 class RequestMetrics:
     """Track metrics for async requests."""
     
-    def __init__(self):
+    def __init__(self, window: int = 10_000):
         self.total_requests = 0
         self.completed_requests = 0
         self.failed_requests = 0
         self.total_time = 0
-        self.request_times = []
+        # Fixed-size ring of the most recent latencies; memory and get_stats
+        # cost stay bounded no matter how long the process runs
+        self.request_times = np.empty(window, dtype=np.float64)
+        self._n_samples = 0
     
     async def track_request(self, coro):
         """Track async request execution."""
         self.total_requests += 1
-        start = time.time()
+        start = _perf()
         
         try:
             result = await coro
@@ -275,25 +379,32 @@ class RequestMetrics:
             self.failed_requests += 1
             raise
         finally:
-            elapsed = time.time() - start
+            elapsed = _perf() - start
             self.total_time += elapsed
-            self.request_times.append(elapsed)
+            self._record(elapsed)
+    
+    def _record(self, elapsed: float):
+        """Store a sample, overwriting the oldest once the window is full."""
+        self.request_times[self._n_samples % len(self.request_times)] = elapsed
+        self._n_samples += 1
     
     def get_stats(self) -> dict:
         """Get request statistics."""
-        if not self.request_times:
+        if not self._n_samples:
             return {}
         
-        sorted_times = sorted(self.request_times)
+        # Percentiles cover the most recent ``window`` requests
+        times = self.request_times[:min(self._n_samples, len(self.request_times))]
+        p50, p95, p99 = np.quantile(times, [0.5, 0.95, 0.99], method='lower')
         return {
             'total_requests': self.total_requests,
             'completed': self.completed_requests,
             'failed': self.failed_requests,
             'success_rate': self.completed_requests / self.total_requests if self.total_requests > 0 else 0,
             'avg_time_ms': (self.total_time / self.total_requests) * 1000,
-            'median_time_ms': sorted_times[len(sorted_times) // 2] * 1000,
-            'p95_time_ms': sorted_times[int(len(sorted_times) * 0.95)] * 1000,
-            'p99_time_ms': sorted_times[int(len(sorted_times) * 0.99)] * 1000,
+            'median_time_ms': float(p50) * 1000,
+            'p95_time_ms': float(p95) * 1000,
+            'p99_time_ms': float(p99) * 1000,
         }
 
 
@@ -308,6 +419,18 @@ async def get_request_metrics() -> dict:
 
 # Example usage patterns for FastAPI
 """
+App lifespan (one shared fetcher; releases pooled resources on shutdown):
+
+fetcher = ParallelDataFetcher()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await fetcher.aclose()
+    shutdown_executor()
+
+app = FastAPI(lifespan=lifespan)
+
 From FastAPI routes:
 
 # Pattern 1: Async endpoint with concurrent tasks
@@ -332,11 +455,19 @@ async def assess_portfolio(portfolio_id: str, background_tasks: BackgroundTasks)
 # Pattern 3: Fetch from multiple sources
 @app.get("/dashboard/{portfolio_id}")
 async def get_dashboard(portfolio_id: str):
-    fetcher = ParallelDataFetcher()
     results = await fetcher.fetch_multiple([
         lambda: fetch_metrics(portfolio_id),
         lambda: fetch_events(portfolio_id),
         lambda: fetch_alerts(portfolio_id)
     ])
     return {'metrics': results[0], 'events': results[1], 'alerts': results[2]}
+
+# Pattern 4: Fetch HTTP sources over the shared keep-alive client
+@app.get("/dashboard/{portfolio_id}/remote")
+async def get_remote_dashboard(portfolio_id: str):
+    metrics, events = await fetcher.fetch_many([
+        f"{METRICS_URL}/{portfolio_id}",
+        f"{EVENTS_URL}/{portfolio_id}",
+    ])
+    return {'metrics': metrics, 'events': events}
 """
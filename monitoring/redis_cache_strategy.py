@@ -12,156 +12,727 @@ Expected improvements:
 - Reduced ClickHouse load by 30%
 """
 
+import asyncio
 import redis
-import json
+import redis.asyncio as aioredis
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
+import orjson
 import hashlib
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_right
+from fnmatch import fnmatchcase
 from functools import wraps
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Callable, Dict, List, Set, Tuple
 from datetime import datetime, timedelta
 import logging
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cachetools
+except ImportError:
+    cachetools = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+# orjson options: stringify non-str dict keys (as json.dumps did) and accept numpy arrays
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Upper bounds (bytes) of the serialized payload size histogram
+_SIZE_BUCKETS = (1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024)
+_SIZE_LABELS = ('le_1k', 'le_16k', 'le_64k', 'le_256k', 'le_1m', 'gt_1m')
+
+# Stored payloads carry a one-byte tag: zstd-compressed or raw
+_ZSTD_TAG = b'Z'
+_RAW_TAG = b'R'
+_COMPRESS_MIN_BYTES = 1024
+_ZSTD_LEVEL = 3
+
+# zstd contexts aren't thread-safe and the sync helpers may run on worker threads
+_zstd_local = threading.local()
+
+
+def _zstd_compress(raw: bytes) -> bytes:
+    compressor = getattr(_zstd_local, 'compressor', None)
+    if compressor is None:
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+    return compressor.compress(raw)
+
+
+def _zstd_decompress(payload: bytes) -> bytes:
+    decompressor = getattr(_zstd_local, 'decompressor', None)
+    if decompressor is None:
+        decompressor = _zstd_local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(payload)
+
+
+# Sentinel for L1 lookups, so cached falsy values still count as hits
+_MISS = object()
+
+# Connection pools shared process-wide, one per (host, port, db, sync) endpoint
+_POOLS: Dict[Tuple[str, int, int, bool], Any] = {}
+
+
+def get_client(
+    host: str = 'redis',
+    port: int = 6379,
+    db: int = 0,
+    max_connections: int = 10,
+    sync: bool = False
+):
+    """Get a Redis client backed by the shared pool for this endpoint.
+    
+    The pool is created on first use and reused by every later caller, so
+    all managers and services in a process share one set of sockets. The
+    first caller's ``max_connections`` sizes the pool. Connections open
+    lazily; a failed command is retried once, and ``RedisCacheManager``
+    stops calling Redis for a cooldown after a connection failure.
+    """
+    key = (host, port, db, sync)
+    pool = _POOLS.get(key)
+    if pool is None:
+        pool_kwargs = dict(
+            host=host,
+            port=port,
+            db=db,
+            max_connections=max_connections,
+            decode_responses=False,
+            socket_connect_timeout=5,
+            socket_keepalive=True
+        )
+        # Blocking pools make callers wait for a free connection instead
+        # of failing when all connections are busy
+        if sync:
+            pool = redis.BlockingConnectionPool(
+                retry=Retry(ExponentialBackoff(), 1), **pool_kwargs
+            )
+        else:
+            pool = aioredis.BlockingConnectionPool(
+                retry=AsyncRetry(ExponentialBackoff(), 1), **pool_kwargs
+            )
+        _POOLS[key] = pool
+        logger.info(f"Redis pool configured: {host}:{port}/{db} ({max_connections} connections)")
+    if sync:
+        return redis.Redis(connection_pool=pool)
+    return aioredis.Redis(connection_pool=pool)
+
 
 class RedisCacheManager:
-    """Manages Redis connections and cache operations."""
+    """Manages Redis connections and cache operations.
     
-    def __init__(self, host: str = 'redis', port: int = 6379, db: int = 0, default_ttl: int = 3600):
+    Cache operations are async and run on the process-wide ``redis.asyncio``
+    pool from ``get_client()``, so concurrent handlers overlap their Redis
+    I/O instead of blocking the event loop. ``get_sync``/``set_sync`` serve
+    plain (non-async) callers.
+    
+    When cachetools is installed, async reads go through a per-process L1
+    cache first. Each L1 entry expires after ``local_ttl`` seconds or with
+    its Redis TTL, whichever comes first. Revision bumps made by this
+    process apply to L1 immediately; writes from other workers are picked up
+    once the local entry expires, so cross-worker staleness is bounded by
+    ``local_ttl``.
+    L1 hands out the same object to every caller, so treat values as
+    read-only.
+    
+    ``get``/``mget`` read from ``replica_host`` (default: the
+    ``REDIS_REPLICA_HOST`` env var) when one is configured; everything else,
+    including revision lookups, goes to the primary so invalidations are
+    never hidden by replication lag.
+    
+    After a connection failure, Redis calls are skipped for
+    ``failure_cooldown`` seconds and behave as misses, so a Redis outage costs
+    one failed call per cooldown rather than a connect timeout per request.
+    """
+    
+    def __init__(
+        self,
+        host: str = 'redis',
+        port: int = 6379,
+        db: int = 0,
+        default_ttl: int = 3600,
+        pool_size: int = 10,
+        serializer: str = 'json',
+        local_maxsize: int = 10_000,
+        local_ttl: int = 30,
+        replica_host: Optional[str] = None,
+        failure_cooldown: float = 5.0
+    ):
         self.host = host
+        self.replica_host = replica_host or os.getenv('REDIS_REPLICA_HOST') or None
         self.port = port
         self.db = db
         self.default_ttl = default_ttl
+        self.pool_size = pool_size
+        # 'json' (orjson) or 'msgpack' (more compact for float-heavy values)
+        if serializer == 'msgpack' and msgpack is None:
+            raise ValueError("msgpack serializer requested but msgpack is not installed")
+        self.serializer = serializer
+        self.local_ttl = local_ttl
+        # Entries are stored as (value, ttl) so each expires on its own TTL
+        self._local = (
+            cachetools.TLRUCache(maxsize=local_maxsize, ttu=lambda _key, entry, now: now + entry[1])
+            if cachetools is not None and local_maxsize > 0 else None
+        )
+        self.stats = {
+            'l1_hits': 0, 'l2_hits': 0, 'misses': 0,
+            'payload_sizes': dict.fromkeys(_SIZE_LABELS, 0),
+        }
+        self.failure_cooldown = failure_cooldown
+        self._retry_at = 0.0
         self.redis_client = None
+        self.read_client = None
+        self.sync_client = None
         self.connect()
     
     def connect(self):
-        """Establish Redis connection with retry logic."""
+        """Attach to the shared connection pools for this endpoint."""
         try:
-            self.redis_client = redis.Redis(
-                host=self.host,
-                port=self.port,
-                db=self.db,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_keepalive=True
+            self.redis_client = get_client(self.host, self.port, self.db, self.pool_size)
+            self.read_client = (
+                get_client(self.replica_host, self.port, self.db, self.pool_size)
+                if self.replica_host else self.redis_client
             )
-            self.redis_client.ping()
-            logger.info(f"Redis connected: {self.host}:{self.port}")
-        except redis.ConnectionError as e:
-            logger.error(f"Redis connection failed: {e}")
+            self.sync_client = get_client(self.host, self.port, self.db, self.pool_size, sync=True)
+        except redis.RedisError as e:
+            logger.error(f"Redis pool setup failed: {e}")
             self.redis_client = None
+            self.read_client = None
+            self.sync_client = None
+    
+    def _up(self) -> bool:
+        """False while calls are skipped after a connection failure."""
+        return time.monotonic() >= self._retry_at
+    
+    def _failed(self, e: Exception):
+        """Skip Redis for ``failure_cooldown`` seconds after a connection error."""
+        if isinstance(e, (redis.ConnectionError, redis.TimeoutError, OSError)):
+            if self._up():
+                logger.warning(f"Redis unreachable, bypassing cache for {self.failure_cooldown}s: {e}")
+            self._retry_at = time.monotonic() + self.failure_cooldown
+    
+    def _record_size(self, size: int):
+        """Count a serialized payload in the size histogram."""
+        self.stats['payload_sizes'][_SIZE_LABELS[bisect_right(_SIZE_BUCKETS, size - 1)]] += 1
+    
+    def _dumps(self, value: Any) -> bytes:
+        """Serialize a value for storage, zstd-compressing payloads over 1 KiB."""
+        if self.serializer == 'msgpack':
+            raw = msgpack.packb(value, use_bin_type=True)
+        else:
+            raw = orjson.dumps(value, option=_ORJSON_OPTS)
+        self._record_size(len(raw))
+        if zstandard is not None and len(raw) > _COMPRESS_MIN_BYTES:
+            return _ZSTD_TAG + _zstd_compress(raw)
+        return _RAW_TAG + raw
+    
+    def _loads(self, payload: bytes) -> Any:
+        """Deserialize a stored value."""
+        # Slice through a memoryview so large payloads aren't copied
+        tag, raw = payload[:1], memoryview(payload)[1:]
+        if tag == _ZSTD_TAG:
+            if zstandard is None:
+                raise ValueError("zstd-compressed cache value but zstandard is not installed")
+            raw = _zstd_decompress(raw)
+        elif tag != _RAW_TAG:
+            # Untagged value written before compression was introduced
+            raw = payload
+        self._record_size(len(raw))
+        if self.serializer == 'msgpack':
+            return msgpack.unpackb(raw, raw=False)
+        return orjson.loads(raw)
     
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache."""
-        if not self.redis_client:
+    def _local_get(self, key: str) -> Any:
+        """Look a key up in L1, returning ``_MISS`` when absent."""
+        if self._local is None:
+            return _MISS
+        entry = self._local.get(key)
+        return _MISS if entry is None else entry[0]
+    
+    def _local_set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value in L1 for min(local_ttl, ttl) seconds.
+        
+        ``ttl`` is the entry's remaining Redis lifetime; None means it has no
+        expiry of its own (revision counters). No-op without cachetools.
+        """
+        if self._local is None:
+            return
+        ttl = self.local_ttl if ttl is None else min(self.local_ttl, ttl)
+        if ttl > 0:
+            self._local[key] = (value, ttl)
+    
+    @staticmethod
+    def _remaining_ttl(pttl: Optional[int]) -> Optional[float]:
+        """Seconds left from a PTTL reply (None when the key has no expiry)."""
+        return pttl / 1000 if pttl and pttl > 0 else None
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache, checking the in-process L1 before Redis."""
+        value = self._local_get(key)
+        if value is not _MISS:
+            self.stats['l1_hits'] += 1
+            return value
+        if not self.read_client or not self._up():
             return None
         try:
-            value = self.redis_client.get(key)
-            if value:
-                return json.loads(value)
+            # PTTL rides along so the L1 copy never outlives the Redis entry
+            async with self.read_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                raw, pttl = await pipe.execute()
+            if raw:
+                value = self._loads(raw)
+                self._local_set(key, value, self._remaining_ttl(pttl))
+                self.stats['l2_hits'] += 1
+                return value
         except Exception as e:
+            self._failed(e)
             logger.warning(f"Cache GET error for {key}: {e}")
+        self.stats['misses'] += 1
         return None
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """Set value in cache with TTL."""
-        if not self.redis_client:
+        ttl = ttl or self.default_ttl
+        self._local_set(key, value, ttl)
+        if not self.redis_client or not self._up():
             return False
         try:
-            ttl = ttl or self.default_ttl
-            serialized = json.dumps(value)
-            self.redis_client.setex(key, ttl, serialized)
+            await self.redis_client.setex(key, ttl, self._dumps(value))
             return True
         except Exception as e:
+            self._failed(e)
             logger.warning(f"Cache SET error for {key}: {e}")
             return False
     
-    def delete(self, key: str):
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one pipelined round-trip (None for misses)."""
+        results = [self._local_get(key) for key in keys]
+        remote = [i for i, value in enumerate(results) if value is _MISS]
+        self.stats['l1_hits'] += len(keys) - len(remote)
+        for i in remote:
+            results[i] = None
+        if not self.read_client or not remote or not self._up():
+            return results
+        try:
+            async with self.read_client.pipeline(transaction=False) as pipe:
+                for i in remote:
+                    pipe.get(keys[i])
+                    pipe.pttl(keys[i])
+                replies = await pipe.execute()
+        except Exception as e:
+            self._failed(e)
+            logger.warning(f"Cache MGET error for {len(remote)} keys: {e}")
+            return results
+        values = replies[::2]
+        for i, raw, pttl in zip(remote, values, replies[1::2]):
+            if raw:
+                results[i] = self._loads(raw)
+                self._local_set(keys[i], results[i], self._remaining_ttl(pttl))
+        hits = sum(1 for raw in values if raw)
+        self.stats['l2_hits'] += hits
+        self.stats['misses'] += len(remote) - hits
+        return results
+    
+    async def msetex(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """Set several values with a shared TTL in one pipelined round-trip."""
+        ttl = ttl or self.default_ttl
+        for key, value in items.items():
+            self._local_set(key, value, ttl)
+        if not self.redis_client or not items or not self._up():
+            return False
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl, self._dumps(value))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            self._failed(e)
+            logger.warning(f"Cache MSETEX error for {len(items)} keys: {e}")
+            return False
+    
+    async def get_revision(self, scope: str) -> int:
+        """Get the current revision of an invalidation scope (0 if never bumped)."""
+        if not self.redis_client or not self._up():
+            return 0
+        try:
+            revision = await self.redis_client.get(f"rev:{scope}")
+            return int(revision) if revision else 0
+        except Exception as e:
+            self._failed(e)
+            logger.warning(f"Cache revision GET error for {scope}: {e}")
+            return 0
+    
+    async def bump_revision(self, scope: str) -> Optional[int]:
+        """Invalidate every entry tagged with ``scope`` in O(1).
+        
+        Stale entries are never read again and age out through their TTL.
+        The new revision is also written to L1, so this process stops serving
+        stale local entries immediately.
+        """
+        if not self.redis_client or not self._up():
+            return None
+        try:
+            revision = await self.redis_client.incr(f"rev:{scope}")
+            self._local_set(f"rev:{scope}", revision)
+            return revision
+        except Exception as e:
+            self._failed(e)
+            logger.warning(f"Cache revision INCR error for {scope}: {e}")
+            return None
+    
+    async def get_with_revision(self, key: str, scope: str) -> Tuple[Optional[Any], int]:
+        """Get a value and its scope's current revision in one round-trip.
+        
+        Served from L1 without touching Redis when both are held locally.
+        """
+        rev_key = f"rev:{scope}"
+        value, revision = self._local_get(key), self._local_get(rev_key)
+        if value is not _MISS and revision is not _MISS:
+            self.stats['l1_hits'] += 1
+            return value, revision
+        if not self.redis_client or not self._up():
+            return None, 0 if revision is _MISS else revision
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.get(rev_key)
+                pipe.pttl(key)
+                raw, raw_revision, pttl = await pipe.execute()
+        except Exception as e:
+            self._failed(e)
+            logger.warning(f"Cache GET error for {key}: {e}")
+            return None, 0
+        revision = int(raw_revision) if raw_revision else 0
+        self._local_set(rev_key, revision)
+        if not raw:
+            self.stats['misses'] += 1
+            return None, revision
+        value = self._loads(raw)
+        self._local_set(key, value, self._remaining_ttl(pttl))
+        self.stats['l2_hits'] += 1
+        return value, revision
+    
+    async def delete(self, key: str):
         """Delete key from cache."""
-        if not self.redis_client:
+        if self._local is not None:
+            self._local.pop(key, None)
+        if not self.redis_client or not self._up():
             return
         try:
-            self.redis_client.delete(key)
+            await self.redis_client.delete(key)
         except Exception as e:
+            self._failed(e)
             logger.warning(f"Cache DELETE error: {e}")
     
-    def clear_pattern(self, pattern: str):
-        """Delete all keys matching pattern (e.g., 'risk_*')."""
-        if not self.redis_client:
+    async def clear_pattern(self, pattern: str, batch_size: int = 500):
+        """Delete all keys matching pattern (e.g., 'risk_*').
+        
+        Walks the keyspace incrementally with SCAN and removes each batch with
+        UNLINK (memory is reclaimed in a background thread), so Redis is never
+        blocked the way KEYS + DEL would block it. In cluster mode, patterns
+        should carry a hashtag (e.g. 'risk_pred_{portfolio_001}*') so the scan
+        only touches the owning slot. Only the matching L1 entries are evicted.
+        """
+        if self._local is not None:
+            for key in [k for k in self._local if fnmatchcase(k, pattern)]:
+                self._local.pop(key, None)
+        if not self.redis_client or not self._up():
             return
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                self.redis_client.delete(*keys)
-                logger.info(f"Cleared {len(keys)} cache keys matching {pattern}")
+            cleared = 0
+            batch = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    cleared += await self._unlink(batch)
+                    batch = []
+            if batch:
+                cleared += await self._unlink(batch)
+            if cleared:
+                logger.info(f"Cleared {cleared} cache keys matching {pattern}")
         except Exception as e:
+            self._failed(e)
             logger.warning(f"Cache pattern clear error: {e}")
+    
+    async def _unlink(self, keys: List[bytes]) -> int:
+        """UNLINK a batch of keys with a single command."""
+        await self.redis_client.unlink(*keys)
+        return len(keys)
+    
+    def get_sync(self, key: str) -> Optional[Any]:
+        """Get value from cache (blocking, for sync callers)."""
+        if not self.sync_client or not self._up():
+            return None
+        try:
+            value = self.sync_client.get(key)
+            if value:
+                return self._loads(value)
+        except Exception as e:
+            self._failed(e)
+            logger.warning(f"Cache GET error for {key}: {e}")
+        return None
+    
+    def set_sync(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Set value in cache with TTL (blocking, for sync callers)."""
+        if not self.sync_client or not self._up():
+            return False
+        try:
+            self.sync_client.setex(key, ttl or self.default_ttl, self._dumps(value))
+            return True
+        except Exception as e:
+            self._failed(e)
+            logger.warning(f"Cache SET error for {key}: {e}")
+            return False
 
 
 # Global cache manager
 cache_manager = RedisCacheManager()
 
+# Computations in flight per cache key, so concurrent misses share one call
+_inflight: Dict[str, asyncio.Future] = {}
+
+# Background cache writes; held here so they aren't garbage collected mid-flight
+_pending_writes: Set[asyncio.Task] = set()
+_MAX_PENDING_WRITES = 256
+
+
+def _write_behind(key: str, value: Any, ttl: int):
+    """Schedule a cache write without waiting for it.
+    
+    Writes are dropped (not queued) once _MAX_PENDING_WRITES are in flight,
+    so a slow Redis never backpressures the response path; a dropped entry
+    is just recomputed on the next miss. L1 is filled right away so repeat
+    calls in this process hit before the Redis write lands.
+    """
+    cache_manager._local_set(key, value, ttl)
+    if len(_pending_writes) >= _MAX_PENDING_WRITES:
+        logger.warning(f"Cache write dropped, {len(_pending_writes)} writes pending: {key}")
+        return
+    task = asyncio.create_task(cache_manager.set(key, value, ttl))
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
 
-def cache_result(ttl: int = 3600, key_prefix: str = ""):
+
+def cache_result(
+    ttl: int = 3600,
+    key_prefix: str = "",
+    revision_scope: Optional[str] = None,
+    scope_arg: Optional[str] = None
+):
     """Decorator for caching function results.
     
     Args:
         ttl: Time to live in seconds
         key_prefix: Prefix for cache keys (e.g., 'risk_model_')
+        revision_scope: Optional scope template formatted with the call's
+            arguments (e.g., 'portfolio:{portfolio_id}'). Entries are tagged
+            with the scope's revision and ignored once it is bumped, so
+            invalidation is a single INCR. Async functions only.
+        scope_arg: Optional parameter whose value becomes a Redis Cluster
+            hashtag in the key ('{prefix}{value}:...'), so all of one
+            value's entries share a slot and can be SCANned on one node.
+    
+    Concurrent async calls that miss on the same key are coalesced: the first
+    one runs the function and the rest await its result (or exception). If
+    that first call is cancelled, a waiting call takes over the computation.
     """
     def decorator(func: Callable) -> Callable:
+        is_async = inspect.iscoroutinefunction(func)
+        if revision_scope and not is_async:
+            raise TypeError("revision_scope is only supported on async functions")
+        signature = inspect.signature(func)
+        normalize = _make_normalizer(signature)
+        param_names = list(signature.parameters)
+        skip = _skipped_params(signature)
+        func_name = func.__name__
+        scope_index = _scope_index(signature, scope_arg) if scope_arg else None
+        
+        def make_key(values: tuple) -> str:
+            tag = values[scope_index] if scope_index is not None else None
+            return generate_cache_key(func_name, values[skip:], key_prefix, tag)
+        
+        if not is_async:
+            @wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                cache_key = make_key(normalize(args, kwargs))
+                
+                cached_value = cache_manager.get_sync(cache_key)
+                if cached_value is not None:
+                    logger.debug(f"Cache HIT: {cache_key}")
+                    return cached_value
+                
+                logger.debug(f"Cache MISS: {cache_key}")
+                result = func(*args, **kwargs)
+                cache_manager.set_sync(cache_key, result, ttl)
+                return result
+            
+            return sync_wrapper
+        
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             # Generate cache key from function name and arguments
-            cache_key = generate_cache_key(func.__name__, args, kwargs, key_prefix)
+            values = normalize(args, kwargs)
+            cache_key = make_key(values)
             
             # Try to get from cache
-            cached_value = cache_manager.get(cache_key)
+            revision = None
+            if revision_scope:
+                scope = revision_scope.format(**dict(zip(param_names, values)))
+                entry, revision = await cache_manager.get_with_revision(cache_key, scope)
+                # Entries stored under an older revision have been invalidated
+                cached_value = entry['data'] if entry and entry.get('rev') == revision else None
+            else:
+                cached_value = await cache_manager.get(cache_key)
             if cached_value is not None:
                 logger.debug(f"Cache HIT: {cache_key}")
                 return cached_value
             
-            # Cache miss - execute function
+            # Cache miss - join an identical call already in flight, if any
+            while (pending := _inflight.get(cache_key)) is not None:
+                logger.debug(f"Cache MISS (coalesced): {cache_key}")
+                try:
+                    return await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    # Only our own cancellation propagates; if the leader was
+                    # cancelled, join its replacement or take over
+                    if not pending.cancelled() or asyncio.current_task().cancelling():
+                        raise
+            
             logger.debug(f"Cache MISS: {cache_key}")
-            result = await func(*args, **kwargs)
+            pending = asyncio.get_running_loop().create_future()
+            _inflight[cache_key] = pending
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                if isinstance(e, asyncio.CancelledError):
+                    pending.cancel()
+                else:
+                    pending.set_exception(e)
+                    # Mark retrieved so an unawaited failure isn't logged twice
+                    pending.exception()
+                raise
+            else:
+                pending.set_result(result)
+            finally:
+                _inflight.pop(cache_key, None)
             
-            # Store in cache
-            cache_manager.set(cache_key, result, ttl)
+            # Store in cache in the background; the caller already has the value
+            if revision_scope:
+                _write_behind(cache_key, {'rev': revision, 'data': result}, ttl)
+            else:
+                _write_behind(cache_key, result, ttl)
             return result
         
+        return async_wrapper
+    
+    return decorator
+
+
+def cache_batch(keyfn: Callable, ttl: int = 3600, key_prefix: str = ""):
+    """Decorator for caching per-item results of a batch function.
+    
+    The decorated coroutine takes a list of items first and returns one result
+    per item, in order. All item keys are read in one pipeline; the function
+    only runs for the misses, whose results are written back in one pipeline.
+    
+    Args:
+        keyfn: Builds an item's cache key; called as keyfn(item, *args, **kwargs)
+        ttl: Time to live in seconds
+        key_prefix: Prefix for cache keys (e.g., 'features_')
+    """
+    def decorator(func: Callable) -> Callable:
         @wraps(func)
-        def sync_wrapper(*args, **kwargs):
-            cache_key = generate_cache_key(func.__name__, args, kwargs, key_prefix)
+        async def wrapper(items: List[Any], *args, **kwargs):
+            keys = [f"{key_prefix}{keyfn(item, *args, **kwargs)}" for item in items]
+            results = await cache_manager.mget(keys)
             
-            cached_value = cache_manager.get(cache_key)
-            if cached_value is not None:
-                logger.debug(f"Cache HIT: {cache_key}")
-                return cached_value
-            
-            logger.debug(f"Cache MISS: {cache_key}")
-            result = func(*args, **kwargs)
-            cache_manager.set(cache_key, result, ttl)
-            return result
+            missing = [i for i, value in enumerate(results) if value is None]
+            logger.debug(f"Cache batch: {len(items) - len(missing)} HIT, {len(missing)} MISS")
+            if missing:
+                fresh = await func([items[i] for i in missing], *args, **kwargs)
+                for i, value in zip(missing, fresh):
+                    results[i] = value
+                await cache_manager.msetex({keys[i]: results[i] for i in missing}, ttl)
+            return results
         
-        # Return appropriate wrapper
-        import inspect
-        if inspect.iscoroutinefunction(func):
-            return async_wrapper
-        return sync_wrapper
+        return wrapper
     
     return decorator
 
 
-def generate_cache_key(func_name: str, args: tuple, kwargs: dict, prefix: str = "") -> str:
-    """Generate unique cache key from function arguments."""
-    # Exclude 'self' from args for methods
-    args_to_hash = args[1:] if args and isinstance(args[0], object) else args
+def _key_bytes(value: Any) -> bytes:
+    """Canonical bytes for a key component (dicts hashed independent of order)."""
+    try:
+        return orjson.dumps(value, option=_ORJSON_OPTS | orjson.OPT_SORT_KEYS, default=repr)
+    except TypeError:
+        # orjson rejects ints beyond 64 bits without consulting ``default``
+        return repr(value).encode()
+
+
+def _skipped_params(signature: inspect.Signature) -> int:
+    """Number of leading parameters (``self``/``cls``) left out of cache keys."""
+    params = list(signature.parameters)
+    return 1 if params and params[0] in ('self', 'cls') else 0
+
+
+def _scope_index(signature: inspect.Signature, scope_arg: str) -> int:
+    """Position of ``scope_arg`` in a call's normalized argument tuple."""
+    if scope_arg not in signature.parameters:
+        raise ValueError(f"scope_arg {scope_arg!r} is not a parameter")
+    return list(signature.parameters).index(scope_arg)
+
+
+def _make_normalizer(signature: inspect.Signature) -> Callable[[tuple, dict], tuple]:
+    """Build a function packing a call's arguments into one tuple.
+    
+    The tuple holds every parameter in signature order with defaults filled
+    in, so f(1, 2), f(1, b=2) and (when b defaults to 2) f(1) all normalize
+    alike, while f(1, b=3) and f(1, c=3) stay distinct. Callers drop a
+    leading ``self``/``cls`` (see ``_skipped_params``) before hashing.
+    """
+    params = signature.parameters.values()
+    n_params = len(params)
+    # Calls passing every parameter positionally need no binding
+    plain = all(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in params)
     
-    # Create hash from args and kwargs
-    key_data = f"{func_name}:{str(args_to_hash)}:{str(sorted(kwargs.items()))}"
-    key_hash = hashlib.md5(key_data.encode()).hexdigest()[:8]
+    def normalize(args: tuple, kwargs: dict) -> tuple:
+        if plain and not kwargs and len(args) == n_params:
+            return args
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return tuple(bound.arguments.values())
     
-    return f"{prefix}{func_name}:{key_hash}"
+    return normalize
+
+
+def generate_cache_key(func_name: str, values: tuple, prefix: str = "", tag: Any = None) -> str:
+    """Generate unique cache key from a call's normalized argument values.
+    
+    With a ``tag`` the key carries it as a cluster hashtag:
+    ``{prefix}{tag}:{func_name}:{hash}``.
+    """
+    # One orjson pass over the whole tuple; the full 128-bit digest keeps
+    # collisions negligible
+    key_hash = hashlib.blake2b(func_name.encode(), digest_size=16)
+    key_hash.update(b'\x00')
+    key_hash.update(_key_bytes(values))
+    if tag is not None:
+        return f"{prefix}{{{tag}}}:{func_name}:{key_hash.hexdigest()}"
+    return f"{prefix}{func_name}:{key_hash.hexdigest()}"
 
 
 # Cache strategies for specific use cases
@@ -170,58 +741,65 @@ class RiskModelCache:
     """Caching strategy for risk model predictions."""
     
     @staticmethod
-    @cache_result(ttl=3600, key_prefix="risk_pred_")
+    @cache_result(
+        ttl=3600,
+        key_prefix="risk_pred_",
+        revision_scope="portfolio:{portfolio_id}",
+        scope_arg="portfolio_id"
+    )
     async def predict_risk(portfolio_id: str, model_version: str):
         """Cache risk predictions for portfolio."""
         # This will be called from your actual model service
         pass
     
     @staticmethod
-    def invalidate_portfolio(portfolio_id: str):
+    async def invalidate_portfolio(portfolio_id: str):
         """Invalidate cache for specific portfolio."""
-        cache_manager.clear_pattern(f"risk_pred_*{portfolio_id}*")
+        # O(1): old entries are never read again and their TTL frees them
+        await cache_manager.bump_revision(f"portfolio:{portfolio_id}")
 
 
 class MetricsCache:
     """Caching strategy for aggregated metrics."""
     
     @staticmethod
-    @cache_result(ttl=300, key_prefix="metrics_")
+    @cache_result(ttl=300, key_prefix="metrics_", revision_scope="metrics")
     async def get_dashboard_metrics(portfolio_id: str, timeframe: str):
         """Cache dashboard metrics with shorter TTL."""
         pass
     
     @staticmethod
-    def invalidate_metrics():
+    async def invalidate_metrics():
         """Invalidate all metrics cache."""
-        cache_manager.clear_pattern("metrics_*")
+        await cache_manager.bump_revision("metrics")
 
 
 class ClickHouseCache:
     """Caching strategy for ClickHouse query results."""
     
     @staticmethod
-    @cache_result(ttl=1800, key_prefix="ch_")
+    @cache_result(ttl=1800, key_prefix="ch_", revision_scope="events")
     async def query_events(query: str, params: dict):
         """Cache ClickHouse query results."""
         pass
     
     @staticmethod
-    def invalidate_events():
+    async def invalidate_events():
         """Invalidate events cache on data updates."""
-        cache_manager.clear_pattern("ch_*")
+        await cache_manager.bump_revision("events")
 
 
 # Integration with FastAPI
-def get_cache_stats() -> dict:
+async def get_cache_stats() -> dict:
     """Get Redis cache statistics for monitoring."""
     if not cache_manager.redis_client:
         return {"status": "disconnected"}
     
     try:
-        info = cache_manager.redis_client.info()
+        info = await cache_manager.redis_client.info()
         return {
             "status": "connected",
+            **cache_manager.stats,
             "used_memory_mb": info.get('used_memory', 0) / (1024 * 1024),
             "connected_clients": info.get('connected_clients', 0),
             "total_commands_processed": info.get('total_commands_processed', 0),
@@ -233,13 +811,17 @@ def get_cache_stats() -> dict:
 
 
 if __name__ == "__main__":
-    # Test cache operations
-    manager = RedisCacheManager()
-    
-    # Test set/get
-    manager.set("test_key", {"data": "test_value"}, ttl=60)
-    result = manager.get("test_key")
-    print(f"Cache test: {result}")
+    async def main():
+        # Test cache operations on the shared manager
+        await cache_manager.set("test_key", {"data": "test_value"}, ttl=60)
+        result = await cache_manager.get("test_key")
+        print(f"Cache test: {result}")
+        
+        # Print stats
+        print(f"Cache stats: {await get_cache_stats()}")
     
-    # Print stats
-    print(f"Cache stats: {get_cache_stats()}")
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    (uvloop.run if uvloop else asyncio.run)(main())
@@ -0,0 +1,49 @@
+"""Request body validation shared by the FastAPI services
+
+Endpoints take the raw ``Request`` and validate its body with a TypeAdapter
+built once at import, instead of FastAPI's per-request body model handling.
+The helpers here keep the 422 responses and OpenAPI request schemas the same
+as for a declared body model.
+"""
+
+from typing import Any
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ConfigDict, TypeAdapter, ValidationError
+
+# Request/response models are validated once and never mutated; unknown
+# fields are dropped
+FROZEN_MODEL_CONFIG = ConfigDict(frozen=True, extra="ignore")
+
+
+async def parse_body(request: Request, adapter: TypeAdapter) -> Any:
+    """Validate a request's raw JSON body with ``adapter``."""
+    try:
+        return adapter.validate_json(await request.body())
+    except ValidationError as e:
+        # Same 422 response FastAPI gives for a declared body model
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
+
+
+def json_body(adapter: TypeAdapter) -> dict:
+    """``openapi_extra`` documenting the body an endpoint parses itself."""
+    schema = adapter.json_schema()
+    defs = schema.pop("$defs", {})
+
+    # Inline nested models: '#/$defs/...' refs don't resolve inside OpenAPI
+    def inline(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return inline(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {k: inline(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [inline(v) for v in node]
+        return node
+
+    return {"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": inline(schema)}},
+    }}
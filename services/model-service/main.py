@@ -1,26 +1,134 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel, TypeAdapter
 from typing import List, Dict
 import datetime
+import hashlib
+import numpy as np
+import orjson
 
-app = FastAPI(title="Model Service")
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+from monitoring.redis_cache_strategy import cache_batch
+from monitoring.request_validation import FROZEN_MODEL_CONFIG, json_body, parse_body
+
+# Scoring kernels. Mock model: the clipped mean of the features. In production
+# these are where a compiled model (e.g., XGBoost, PyTorch) gets called.
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _clipped_mean(x):
+        return min(1.0, max(0.0, x.mean()))
+
+    # Not parallel=True: uvicorn already runs one worker per core
+    @njit(cache=True, fastmath=True)
+    def _clipped_row_means(X):
+        out = np.empty(X.shape[0])
+        for i in range(X.shape[0]):
+            out[i] = min(1.0, max(0.0, X[i].mean()))
+        return out
+else:
+    def _clipped_mean(x):
+        return float(np.clip(x.mean(), 0.0, 1.0))
+
+    def _clipped_row_means(X):
+        return np.clip(X.mean(axis=1), 0.0, 1.0)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile (or load from cache) the kernels before serving traffic
+    _clipped_mean(np.zeros(1))
+    _clipped_row_means(np.zeros((1, 1)))
+    yield
+
+app = FastAPI(title="Model Service", lifespan=lifespan)
 
 class ModelRequest(BaseModel):
+    model_config = FROZEN_MODEL_CONFIG
+
     cell_id: int
     features: Dict[str, float]
     timestamp: datetime.datetime
 
 class ModelResponse(BaseModel):
+    model_config = FROZEN_MODEL_CONFIG
+
     cell_id: int
     risk_score: float
 
+class BatchModelRequest(BaseModel):
+    model_config = FROZEN_MODEL_CONFIG
+
+    items: List[ModelRequest]
+
+# Built once; endpoints validate raw bodies with them (see monitoring.request_validation)
+_MODEL_REQ_TA = TypeAdapter(ModelRequest)
+_BATCH_TA = TypeAdapter(BatchModelRequest)
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
-@app.post("/predict", response_model=ModelResponse)
-async def predict(request: ModelRequest):
-    # Mock implementation of risk scoring model
-    # In production, this would load a pre-trained model (e.g., XGBoost, PyTorch)
-    score = sum(request.features.values()) / len(request.features) if request.features else 0.0
-    return ModelResponse(cell_id=request.cell_id, risk_score=min(1.0, max(0.0, score)))
+def _score(features: Dict[str, float]) -> float:
+    if not features:
+        return 0.0
+    return float(_clipped_mean(np.fromiter(features.values(), dtype=np.float64, count=len(features))))
+
+def _score_batch(requests: List[ModelRequest]) -> np.ndarray:
+    """Score many requests with array reductions instead of per-dict loops."""
+    n = len(requests)
+    counts = np.fromiter((len(r.features) for r in requests), dtype=np.intp, count=n)
+    values = np.fromiter(
+        (v for r in requests for v in r.features.values()),
+        dtype=np.float64,
+        count=int(counts.sum()),
+    )
+    if n and counts.min() == counts.max() > 0:
+        # Same feature count for every cell: one pass over the (N, F) matrix
+        return _clipped_row_means(values.reshape(n, -1))
+    # Ragged rows: per-row sums via bincount; empty rows score 0
+    sums = np.bincount(np.repeat(np.arange(n), counts), weights=values, minlength=n)
+    means = np.divide(sums, counts, out=np.zeros(n), where=counts > 0)
+    return np.clip(means, 0.0, 1.0)
+
+@app.post("/predict", response_model=ModelResponse, openapi_extra=json_body(_MODEL_REQ_TA))
+async def predict(raw: Request):
+    request = await parse_body(raw, _MODEL_REQ_TA)
+    return ModelResponse(cell_id=request.cell_id, risk_score=_score(request.features))
+
+def _prediction_key(request: ModelRequest) -> str:
+    features_hash = hashlib.blake2b(
+        orjson.dumps(request.features, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+    return f"{request.cell_id}:{request.timestamp.isoformat()}:{features_hash}"
+
+@cache_batch(keyfn=_prediction_key, ttl=3600, key_prefix="model_pred_")
+async def _predict_many(requests: List[ModelRequest]) -> List[dict]:
+    scores = _score_batch(requests)
+    return [
+        {"cell_id": req.cell_id, "risk_score": score}
+        for req, score in zip(requests, scores.tolist())
+    ]
+
+@app.post("/predict_batch", response_model=List[ModelResponse], openapi_extra=json_body(_BATCH_TA))
+async def predict_batch(raw: Request):
+    request = await parse_body(raw, _BATCH_TA)
+    # Scores many cells per HTTP call with one Redis pipeline round-trip
+    return await _predict_many(request.items)
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m services.model-service.main
+    import os
+    import uvicorn
+    # uvloop for cheaper task scheduling, httptools for C HTTP parsing
+    uvicorn.run(
+        "services.model-service.main:app",
+        host="0.0.0.0",
+        port=8002,
+        loop="uvloop",
+        http="httptools",
+        workers=os.cpu_count(),
+        timeout_keep_alive=30,
+    )
@@ -2,6 +2,7 @@
 
 import pytest
 import asyncio
+import json
 from unittest.mock import Mock, AsyncMock, patch
 
 
@@ -44,6 +45,21 @@ class TestPERF2PrometheusGrafana:
             pytest.skip("Grafana dashboard not found")
 
 
+@pytest.fixture
+def offline_cache(monkeypatch):
+    """Cache module with Redis detached from the global manager (L1 only)."""
+    try:
+        import cachetools  # noqa: F401
+        from monitoring import redis_cache_strategy as rc
+    except ImportError:
+        pytest.skip("cachetools or redis_cache_strategy not available")
+    monkeypatch.setattr(rc.cache_manager, 'redis_client', None)
+    monkeypatch.setattr(rc.cache_manager, 'read_client', None)
+    rc.cache_manager._local.clear()
+    yield rc
+    rc.cache_manager._local.clear()
+
+
 class TestPERF3RedisCaching:
     """Test PERF-3: Redis caching strategy."""
     
@@ -67,6 +83,220 @@ class TestPERF3RedisCaching:
         except ImportError:
             pytest.skip("cache_result decorator not found")
     
+    @pytest.mark.asyncio
+    async def test_local_cache_serves_hot_keys(self):
+        """Test L1 hits are answered without touching Redis."""
+        try:
+            import cachetools  # noqa: F401
+            from monitoring.redis_cache_strategy import RedisCacheManager
+        except ImportError:
+            pytest.skip("cachetools or redis_cache_strategy not available")
+        manager = RedisCacheManager(host='localhost', port=6379)
+        manager.redis_client = manager.read_client = None
+        manager._local_set('hot_key', {'score': 0.5})
+        assert await manager.get('hot_key') == {'score': 0.5}
+        assert manager.stats['l1_hits'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_local_cache_honours_entry_ttl(self):
+        """Test L1 entries expire with their own TTL, not local_ttl."""
+        try:
+            import cachetools  # noqa: F401
+            from monitoring.redis_cache_strategy import RedisCacheManager
+        except ImportError:
+            pytest.skip("cachetools or redis_cache_strategy not available")
+        manager = RedisCacheManager(host='localhost', port=6379, local_ttl=30)
+        manager.redis_client = manager.read_client = None
+        await manager.set('short', 'v', ttl=0.05)
+        manager._local_set('long', 'v')
+        assert await manager.get('short') == 'v'
+        await asyncio.sleep(0.1)
+        assert await manager.get('short') is None
+        assert await manager.get('long') == 'v'
+    
+    @pytest.mark.asyncio
+    async def test_unreachable_redis_fails_fast(self):
+        """Test a connection failure makes later calls skip Redis."""
+        try:
+            from monitoring.redis_cache_strategy import RedisCacheManager
+        except ImportError:
+            pytest.skip("redis_cache_strategy module not found")
+        # Nothing listens on port 1, so connecting is refused immediately
+        manager = RedisCacheManager(host='127.0.0.1', port=1, local_maxsize=0)
+        assert await manager.get('k') is None
+        assert not manager._up()
+        assert await manager.mget(['a', 'b']) == [None, None]
+        assert await manager.set('k', 1) is False
+    
+    @pytest.mark.asyncio
+    async def test_batch_values_reused_while_redis_down(self, offline_cache):
+        """Test cache_batch results stay in L1 when Redis can't take them."""
+        calls = []
+        
+        @offline_cache.cache_batch(keyfn=lambda x: str(x), ttl=60, key_prefix="t_batch_")
+        async def load(items):
+            calls.append(list(items))
+            return [x * 2 for x in items]
+        
+        assert await load([1, 2]) == [2, 4]
+        assert await load([2, 3]) == [4, 6]
+        assert calls == [[1, 2], [3]]
+    
+    @pytest.mark.asyncio
+    async def test_cache_key_covers_defaulted_arguments(self, offline_cache):
+        """Test calls overriding different defaults don't share a key."""
+        @offline_cache.cache_result(ttl=60, key_prefix="t_norm_")
+        async def f(a, b=1, c=2):
+            return [a, b, c]
+        
+        assert await f(1, b=3) == [1, 3, 2]
+        assert await f(1, c=3) == [1, 1, 3]
+        
+        @offline_cache.cache_result(ttl=60, revision_scope="s:{b}")
+        async def g(a, b=1):
+            return a
+        
+        # Scope formatted from the default when b is omitted
+        assert await g(5) == 5
+    
+    @pytest.mark.asyncio
+    async def test_cache_key_handles_big_integers(self, offline_cache):
+        """Test arguments orjson can't encode still produce distinct keys."""
+        @offline_cache.cache_result(ttl=60, key_prefix="t_big_")
+        async def f(x):
+            return str(x)
+        
+        assert await f(2**70) == str(2**70)
+        assert await f(2**70 + 1) == str(2**70 + 1)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_run_once(self, offline_cache):
+        """Test duplicate concurrent misses share a single call."""
+        calls = []
+        
+        @offline_cache.cache_result(ttl=60, key_prefix="t_sf_")
+        async def slow(x):
+            calls.append(x)
+            await asyncio.sleep(0.01)
+            return x * 2
+        
+        assert await asyncio.gather(*(slow(3) for _ in range(20))) == [6] * 20
+        assert calls == [3]
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_miss_exception_reaches_waiters(self, offline_cache):
+        """Test a failing call raises in every coalesced caller."""
+        calls = []
+        
+        @offline_cache.cache_result(ttl=60, key_prefix="t_sf_")
+        async def failing(x):
+            calls.append(x)
+            await asyncio.sleep(0.01)
+            raise ValueError("backend down")
+        
+        results = await asyncio.gather(*(failing(1) for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert calls == [1]
+        assert offline_cache._inflight == {}
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_waiters(self, offline_cache):
+        """Test a waiter takes over when the computing call is cancelled."""
+        started = asyncio.Event()
+        calls = []
+        
+        @offline_cache.cache_result(ttl=60, key_prefix="t_sf_")
+        async def slow(x):
+            calls.append(x)
+            started.set()
+            await asyncio.sleep(0.05)
+            return x
+        
+        leader = asyncio.create_task(slow(7))
+        await started.wait()
+        waiter = asyncio.create_task(slow(7))
+        await asyncio.sleep(0)
+        leader.cancel()
+        
+        assert await waiter == 7
+        assert leader.cancelled()
+        assert calls == [7, 7]
+    
+    @pytest.mark.asyncio
+    async def test_bump_revision_forces_recompute(self, offline_cache, monkeypatch):
+        """Test a bumped scope makes the next call recompute."""
+        offline_cache.cache_manager._local_set('rev:t_scope', 1)
+        calls = []
+        
+        @offline_cache.cache_result(ttl=60, key_prefix="t_rev_", revision_scope="t_scope")
+        async def f(x):
+            calls.append(x)
+            return x
+        
+        assert await f(1) == 1
+        assert await f(1) == 1
+        assert calls == [1]
+        redis_client = AsyncMock()
+        redis_client.incr.return_value = 2
+        monkeypatch.setattr(offline_cache.cache_manager, 'redis_client', redis_client)
+        assert await offline_cache.cache_manager.bump_revision('t_scope') == 2
+        monkeypatch.setattr(offline_cache.cache_manager, 'redis_client', None)
+        assert await f(1) == 1
+        assert calls == [1, 1]
+    
+    @pytest.mark.asyncio
+    async def test_stale_revision_entry_is_ignored(self, offline_cache):
+        """Test a {rev, data} entry from an older revision isn't served."""
+        local = offline_cache.cache_manager._local
+        offline_cache.cache_manager._local_set('rev:t_stale', 3)
+        
+        @offline_cache.cache_result(ttl=60, key_prefix="t_stale_", revision_scope="t_stale")
+        async def f(x):
+            return 'fresh'
+        
+        assert await f(1) == 'fresh'
+        (cache_key,) = [k for k in local if k.startswith('t_stale_')]
+        assert local[cache_key][0] == {'rev': 3, 'data': 'fresh'}
+        offline_cache.cache_manager._local_set(cache_key, {'rev': 2, 'data': 'stale'})
+        assert await f(1) == 'fresh'
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_keeps_unrelated_local_entries(self, offline_cache, monkeypatch):
+        """Test portfolio invalidation and pattern clears spare other L1 keys."""
+        manager = offline_cache.cache_manager
+        redis_client = AsyncMock()
+        redis_client.incr.return_value = 1
+        monkeypatch.setattr(manager, 'redis_client', redis_client)
+        manager._local_set('features_1:x', 'kept')
+        await offline_cache.RiskModelCache.invalidate_portfolio('p1')
+        redis_client.scan_iter.assert_not_called()
+        assert manager._local_get('rev:portfolio:p1') == 1
+        assert manager._local_get('features_1:x') == 'kept'
+        
+        monkeypatch.setattr(manager, 'redis_client', None)
+        manager._local_set('risk_pred_{p1}:a', 'gone')
+        await manager.clear_pattern('risk_pred_*')
+        assert manager._local_get('risk_pred_{p1}:a') is offline_cache._MISS
+        assert manager._local_get('features_1:x') == 'kept'
+    
+    def test_payload_round_trip(self, offline_cache):
+        """Test raw, zstd-compressed and legacy untagged payloads load back."""
+        manager = offline_cache.cache_manager
+        small = {'score': 0.5}
+        payload = manager._dumps(small)
+        assert payload[:1] == b'R'
+        assert manager._loads(payload) == small
+        # Written before payloads were tagged
+        assert manager._loads(b'{"score":0.5}') == small
+        
+        if offline_cache.zstandard is None:
+            pytest.skip("zstandard not installed")
+        large = {'values': [0.5] * 1000}
+        payload = manager._dumps(large)
+        assert payload[:1] == b'Z'
+        assert len(payload) < len(manager._dumps(small)) + 1024
+        assert manager._loads(payload) == large
+    
     def test_cache_ttl_configuration(self):
         """Verify cache TTL values are properly configured."""
         try:
@@ -170,6 +400,28 @@ class TestPERF6AsyncProcessing:
         except ImportError:
             pytest.skip("AsyncTaskQueue not found")
     
+    @pytest.mark.asyncio
+    async def test_async_task_queue_bounded_workers(self):
+        """Test add_tasks preserves order and caps concurrency."""
+        try:
+            from monitoring.async_request_processing import AsyncTaskQueue
+            queue = AsyncTaskQueue(max_concurrent=2)
+            running = peak = 0
+            
+            async def job(i):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0)
+                running -= 1
+                return i
+            
+            results = await queue.add_tasks([lambda i=i: job(i) for i in range(6)])
+            assert results == list(range(6))
+            assert peak <= 2
+        except ImportError:
+            pytest.skip("AsyncTaskQueue not found")
+    
     def test_batch_processor_exists(self):
         """Test BatchProcessor is available."""
         try:
@@ -188,6 +440,18 @@ class TestPERF6AsyncProcessing:
         except ImportError:
             pytest.skip("RateLimiter not found")
     
+    @pytest.mark.asyncio
+    async def test_rate_limiter_window(self):
+        """Test RateLimiter rejects requests beyond the window capacity."""
+        try:
+            from monitoring.async_request_processing import RateLimiter
+            limiter = RateLimiter(max_requests=2, window_seconds=60)
+            assert await limiter.acquire()
+            assert await limiter.acquire()
+            assert not await limiter.acquire()
+        except ImportError:
+            pytest.skip("RateLimiter not found")
+    
     def test_request_metrics_tracking(self):
         """Test RequestMetrics tracks stats properly."""
         try:
@@ -197,7 +461,105 @@ class TestPERF6AsyncProcessing:
             assert metrics.completed_requests == 0
         except ImportError:
             pytest.skip("RequestMetrics not found")
+    
+    @pytest.mark.asyncio
+    async def test_request_metrics_percentiles(self):
+        """Test RequestMetrics sliding window and percentile stats."""
+        try:
+            from monitoring.async_request_processing import RequestMetrics
+            metrics = RequestMetrics(window=4)
+            for _ in range(10):
+                await metrics.track_request(asyncio.sleep(0))
+            stats = metrics.get_stats()
+            assert stats['total_requests'] == 10
+            assert stats['median_time_ms'] <= stats['p95_time_ms'] <= stats['p99_time_ms']
+        except ImportError:
+            pytest.skip("RequestMetrics not found")
+
+
+@pytest.fixture
+def service_client(offline_cache):
+    """Open a TestClient on a service app, with the cache in L1-only mode."""
+    try:
+        import importlib
+        from fastapi.testclient import TestClient
+    except ImportError:
+        pytest.skip("fastapi TestClient not available")
+    clients = []
+    
+    def open_client(name):
+        try:
+            module = importlib.import_module(f"services.{name}.main")
+        except ImportError as e:
+            pytest.skip(f"{name} dependencies not available: {e}")
+        client = TestClient(module.app)
+        clients.append(client.__enter__())
+        return client
+    
+    yield open_client
+    for client in clients:
+        client.__exit__(None, None, None)
+
+
+class TestServiceEndpoints:
+    """Test the feature and model services through their HTTP APIs."""
+    
+    def test_predict_batch_matches_clipped_mean(self, service_client):
+        """Test uniform, ragged and empty rows score like sum/len clipped."""
+        client = service_client("model-service")
+        ts = "2025-01-01T00:00:00"
+        
+        def expected(features):
+            score = sum(features.values()) / len(features) if features else 0.0
+            return min(1.0, max(0.0, score))
+        
+        uniform = [{"a": 0.2, "b": 0.4}, {"a": 1.5, "b": 0.9}, {"a": -0.3, "b": 0.1}]
+        ragged = [{"a": 0.2}, {"a": 0.9, "b": 0.8, "c": 0.1}, {}, {"a": 3.0, "b": 2.0}]
+        for rows in (uniform, ragged, [{}, {}], []):
+            items = [{"cell_id": i, "features": f, "timestamp": ts} for i, f in enumerate(rows)]
+            response = client.post("/predict_batch", json={"items": items})
+            assert response.status_code == 200
+            assert [r["cell_id"] for r in response.json()] == list(range(len(rows)))
+            assert [r["risk_score"] for r in response.json()] == pytest.approx(
+                [expected(f) for f in rows]
+            )
 
+    
+    def test_invalid_body_reports_body_locations(self, service_client):
+        """Test validation errors come back as FastAPI's usual 422."""
+        client = service_client("model-service")
+        response = client.post("/predict", json={"cell_id": "x", "features": {}})
+        assert response.status_code == 422
+        locs = {tuple(err["loc"]) for err in response.json()["detail"]}
+        assert locs == {("body", "cell_id"), ("body", "timestamp")}
+        
+        response = client.post("/predict_batch", json={"items": [{"cell_id": 1}]})
+        assert response.status_code == 422
+        assert all(err["loc"][:3] == ["body", "items", 0] for err in response.json()["detail"])
+    
+    def test_request_schema_inlines_nested_models(self, service_client):
+        """Test /predict_batch documents its body without unresolved $defs refs."""
+        client = service_client("model-service")
+        body = client.get("/openapi.json").json()["paths"]["/predict_batch"]["post"]["requestBody"]
+        assert body["required"] is True
+        schema = body["content"]["application/json"]["schema"]
+        assert "$ref" not in json.dumps(schema) and "$defs" not in schema
+        item = schema["properties"]["items"]["items"]
+        assert set(item["properties"]) == {"cell_id", "features", "timestamp"}
+    
+    def test_feature_stream_frames_json_array(self, service_client):
+        """Test streamed feature arrays parse at the empty and chunk edges."""
+        client = service_client("feature-service")
+        for n in (0, 1, 256, 257):
+            response = client.post("/get-features", json={
+                "cell_ids": list(range(n)),
+                "timestamp": "2025-01-01T00:00:00",
+                "features": ["a", "b"],
+            })
+            assert response.status_code == 200
+            body = json.loads(response.content)
+            assert [item["cell_id"] for item in body] == list(range(n))
+            assert all(item["values"] == {"a": 0.5, "b": 0.5} for item in body)
 
 class TestIntegrationSuite:
     """Integration tests across all PERF components."""